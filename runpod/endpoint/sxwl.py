@@ -1,18 +1,128 @@
+import asyncio
+import atexit
 import json
+import logging
+import random
 import time
+import weakref
+import orjson
 import requests
-from typing import Optional, Dict, Any, List
+import runpod  # pylint: disable=cyclic-import
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
+from requests.adapters import HTTPAdapter, Retry
+from threading import Lock, RLock
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 from dataclasses import dataclass
 
+# 可通过 logging.getLogger('runpod.sxwl').setLevel(logging.WARNING) 关闭进度输出
+logger = logging.getLogger('runpod.sxwl')
+
+# 模型目录变化缓慢, 适配器列表只在微调完成后变化; 两者均按 token 缓存
+_MODELS_CACHE = TTLCache(maxsize=4, ttl=300)
+_ADAPTERS_CACHE = TTLCache(maxsize=4, ttl=60)
+_CACHE_LOCK = RLock()
+
+
+def _token_key(client: 'SXWLClient', *args, **kwargs):
+    return hashkey(client.config.token)
+
+# 所有存活的 SXWLClient, 只持有弱引用, 不妨碍客户端被回收
+_LIVE_CLIENTS: 'weakref.WeakSet[SXWLClient]' = weakref.WeakSet()
+
+# 服务端不支持 SSE 事件流时返回的状态码, 此时回退为轮询
+SSE_FALLBACK_STATUS = (404, 415)
+
+# 单次请求的 (连接, 读取) 超时 (秒); 对话生成耗时较长, 单独放宽读取超时
+DEFAULT_TIMEOUT = (3.05, 15)
+CHAT_TIMEOUT = (3.05, 60)
+# 事件流的读取超时远大于退避上限, 服务端不发心跳时也不会退化为每 30 秒重连一次
+SSE_READ_TIMEOUT = 300
+ASYNC_DEFAULT_TIMEOUT = ClientTimeout(sock_connect=DEFAULT_TIMEOUT[0], sock_read=DEFAULT_TIMEOUT[1])
+
+# 等待服务/任务的默认总时长, 以及指数退避的初始间隔与上限 (秒)
+DEFAULT_WAIT_TIMEOUT = 1800
+BACKOFF_BASE = 2
+BACKOFF_CAP = 30
+
+
+def _backoff_delay(attempt: int, deadline: float, base: float = BACKOFF_BASE,
+                   cap: float = BACKOFF_CAP) -> float:
+    """带抖动的指数退避间隔, 不会超过距截止时间的剩余秒数"""
+    # 限制指数, 长时间等待时 1.5 ** attempt 会溢出 float
+    delay = min(cap, base * (1.5 ** min(attempt, 32))) * random.uniform(0.7, 1.0)
+    return max(0.0, min(delay, deadline - time.monotonic()))
+
+
+class EventStreamUnsupported(RuntimeError):
+    """服务端不提供 text/event-stream 事件流"""
+
+
+def _parse_sse(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """按 WHATWG SSE 规范解析事件流, 每遇到空行分发一个事件"""
+    event_type, data, event_id = 'message', [], None
+    for line in lines:
+        if not line:
+            if data:
+                payload = '\n'.join(data)
+                try:
+                    payload = orjson.loads(payload)
+                except orjson.JSONDecodeError:
+                    pass
+                yield {'event': event_type, 'data': payload, 'id': event_id}
+            event_type, data = 'message', []
+            continue
+        if line.startswith(':'):
+            continue
+        field, _, value = line.partition(':')
+        if value.startswith(' '):
+            value = value[1:]
+        if field == 'event':
+            event_type = value
+        elif field == 'data':
+            data.append(value)
+        elif field == 'id' and '\0' not in value:
+            # id 在事件之间保持, 作为重连时的 Last-Event-ID
+            event_id = value
+
+
+def _index_by(items: Iterable[Dict[str, Any]], key: str) -> Dict[Any, Dict[str, Any]]:
+    """按指定字段为列表建立索引, 之后按名称查找为 O(1)"""
+    return {item[key]: item for item in items}
+
+
+def _find_adapter_id(adapters: Iterable[Dict[str, Any]], job_id: str) -> Optional[str]:
+    """在适配器列表中查找由指定微调任务产生的适配器"""
+    for adapter in adapters:
+        meta_raw = adapter.get('meta') or ''
+        # 先做子串检查, 只解析可能命中的 meta
+        if job_id not in meta_raw:
+            continue
+        try:
+            meta = orjson.loads(meta_raw)
+        except orjson.JSONDecodeError:
+            continue
+        # 子串命中并不精确, 仍需核对 finetune_id
+        if isinstance(meta, dict) and meta.get('finetune_id') == job_id:
+            return adapter['id']
+    return None
+
+
+def _json(response: requests.Response) -> Any:
+    """用 orjson 直接解析响应字节, 比 response.json() 更快"""
+    return orjson.loads(response.content)
+
 
-# 全局变量用于存储需要清理的资源
-resources_to_cleanup = {
-    'inference_services': set(),
-    'finetune_jobs': set()
-}
+def _dumps(obj: Any) -> bytes:
+    """用 orjson 序列化请求体; 与标准库 json 一样接受非字符串键, 超出 64 位的整数等回退到 json"""
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        return json.dumps(obj).encode('utf-8')
 
 
-@dataclass
+@dataclass(frozen=True)
 class APIConfig:
     base_url: str
     token: str
@@ -20,14 +130,10 @@ class APIConfig:
 
     @classmethod
     def create_default(cls) -> 'APIConfig':
-        from runpod import (  # pylint: disable=import-outside-toplevel, cyclic-import
-            api_key,
-            endpoint_url_base,
-        )
-        token = api_key
-        if token and isinstance(token, bytes):
-            # 如果是 bytes，解码为字符串
-            token = token.decode('utf-8')
+        # 在调用时读取, 以便使用导入 runpod 之后设置的 api_key / endpoint_url_base
+        api_key, endpoint_url_base = runpod.api_key, runpod.endpoint_url_base
+        # 如果是 bytes，解码为字符串
+        token = api_key.decode('utf-8') if isinstance(api_key, bytes) else api_key
         headers = {
             'Accept': 'application/json, text/plain, */*',
             'Authorization': f'Bearer {token}',
@@ -41,42 +147,199 @@ class APIConfig:
 class SXWLClient:
     def __init__(self, config: APIConfig):
         self.config = config
-
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        # 复用同一个 Session, 通过 keep-alive 避免每次请求重新握手
+        self.session = requests.Session()
+        self.session.headers.update(config.headers)
+        # 读超时不重试: 直接抛出 ReadTimeout 交给轮询循环处理, 单次请求耗时也不超过 timeout
+        retries = Retry(total=3, read=False, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                        raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # 访问模型 api_endpoint 的独立 Session, 不携带控制面的认证头/Cookie 和重试策略
+        self.chat_session = requests.Session()
+        # 处于 with 块中且尚未删除的资源; 进程在 with 块内退出时 (如守护线程) 由退出钩子删除
+        self._live_inferences: 'weakref.WeakSet[InferenceService]' = weakref.WeakSet()
+        self._live_finetunes: 'weakref.WeakSet[FinetuneJob]' = weakref.WeakSet()
+        self._live_lock = Lock()
+        _LIVE_CLIENTS.add(self)
+
+    def _cleanup_all(self) -> None:
+        """删除本客户端仍在跟踪的推理服务和微调任务"""
+        with self._live_lock:
+            services = [svc.service_name for svc in self._live_inferences]
+            jobs = [job.job_id for job in self._live_finetunes]
+        for service_name in services:
+            self.delete_inference_service(service_name)
+        for job_id in jobs:
+            self.delete_finetune_job(job_id)
+
+    def _make_request(self, method: str, endpoint: str, *, timeout: Any = DEFAULT_TIMEOUT,
+                      **kwargs) -> requests.Response:
         url = f"{self.config.base_url}/api{endpoint}"
-        response = requests.request(method, url, headers=self.config.headers, **kwargs)
+        if 'json' in kwargs:
+            # Content-Type: application/json 已在 session 头中设置
+            kwargs['data'] = _dumps(kwargs.pop('json'))
+        response = self.session.request(method, url, timeout=timeout, **kwargs)
         response.raise_for_status()
         return response
 
+    def _open_event_stream(self, endpoint: str, last_event_id: Optional[str] = None,
+                           timeout: Any = None) -> requests.Response:
+        """建立 SSE 连接并校验响应, 返回尚未读取的流式响应"""
+        url = f"{self.config.base_url}/api{endpoint}"
+        headers = {'Accept': 'text/event-stream'}
+        if last_event_id is not None:
+            headers['Last-Event-ID'] = last_event_id
+
+        response = self.session.get(url, headers=headers, stream=True, timeout=timeout)
+        try:
+            content_type = response.headers.get('Content-Type', '')
+            if (response.status_code in SSE_FALLBACK_STATUS
+                    or (response.ok and not content_type.startswith('text/event-stream'))):
+                raise EventStreamUnsupported(f"{endpoint} 不支持事件流")
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        # SSE 固定使用 UTF-8, 不能依赖 requests 对 text/* 的默认编码推断
+        response.encoding = 'utf-8'
+        return response
+
+    def stream_events(self, endpoint: str, last_event_id: Optional[str] = None,
+                      timeout: Any = None) -> Iterator[Dict[str, Any]]:
+        """订阅服务端推送的 SSE 事件流, 逐个返回 {'event', 'data', 'id'}"""
+        with self._open_event_stream(endpoint, last_event_id, timeout) as response:
+            yield from _parse_sse(response.iter_lines(chunk_size=None, decode_unicode=True))
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """清空模型与适配器列表缓存"""
+        with _CACHE_LOCK:
+            _MODELS_CACHE.clear()
+            _ADAPTERS_CACHE.clear()
+        _STATUS_BATCHER.invalidate()
+
+    @cached(_MODELS_CACHE, key=_token_key, lock=_CACHE_LOCK)
+    def _fetch_models(self) -> List[Dict[str, Any]]:
+        data = _json(self._make_request('GET', '/resource/models'))
+        return data.get('public_list', []) + data.get('user_list', [])
+
+    @cached(_ADAPTERS_CACHE, key=_token_key, lock=_CACHE_LOCK)
+    def _fetch_adapters(self) -> List[Dict[str, Any]]:
+        return _json(self._make_request('GET', '/resource/adapters')).get('user_list', [])
+
+    def get_adapters(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """获取用户的适配器列表, refresh 为 True 时跳过缓存"""
+        if refresh:
+            with _CACHE_LOCK:
+                _ADAPTERS_CACHE.pop(_token_key(self), None)
+        return list(self._fetch_adapters())
+
     def get_models(self) -> List[Dict[str, Any]]:
         """获取可用的模型列表"""
         try:
-            response = self._make_request('GET', '/resource/models')
-            data = response.json()
-            models = data.get('public_list', []) + data.get('user_list', [])
-            print(f"获取到 {len(models)} 个模型", flush=True)
+            models = list(self._fetch_models())
+            logger.info("获取到 %d 个模型", len(models))
             return models
         except Exception as e:
-            print(f"获取模型列表失败: {str(e)}", flush=True)
+            logger.error("获取模型列表失败: %s", e)
             return []
 
     def delete_inference_service(self, service_name: str) -> None:
         try:
             self._make_request('DELETE', '/job/inference', params={'service_name': service_name})
-            print("推理服务删除成功", flush=True)
-            resources_to_cleanup['inference_services'].discard(service_name)
+            self.clear_cache()
+            logger.info("推理服务删除成功")
+            with self._live_lock:
+                for service in list(self._live_inferences):
+                    if service.service_name == service_name:
+                        self._live_inferences.discard(service)
         except Exception as e:
-            print(f"删除推理服务失败: {str(e)}", flush=True)
+            logger.error("删除推理服务失败: %s", e)
 
     def delete_finetune_job(self, finetune_id: str) -> None:
         try:
             self._make_request('POST', '/userJob/job_del', json={'job_id': finetune_id})
-            print("微调任务删除成功", flush=True)
-            resources_to_cleanup['finetune_jobs'].discard(finetune_id)
+            self.clear_cache()
+            logger.info("微调任务删除成功")
+            with self._live_lock:
+                for job in list(self._live_finetunes):
+                    if job.job_id == finetune_id:
+                        self._live_finetunes.discard(job)
         except Exception as e:
-            print(f"删除微调任务失败: {str(e)}", flush=True)
+            logger.error("删除微调任务失败: %s", e)
+
+@atexit.register
+def _cleanup_live_clients() -> None:
+    """进程退出时删除仍处于 with 块中的资源; 未用作上下文管理器的资源保留在服务端"""
+    for client in list(_LIVE_CLIENTS):
+        client._cleanup_all()
+
+
+class _StatusBatcher:
+    """在一个短时间窗口内合并 /job/inference 查询, 所有 InferenceService 共享同一份结果"""
+
+    def __init__(self, ttl: float = 1.0):
+        self._cache = TTLCache(maxsize=1, ttl=ttl)
+        # token -> (ETag, 对应的映射), 窗口过期后用 If-None-Match 重新校验
+        self._validators: Dict[str, Tuple[str, Dict[str, Dict[str, Any]]]] = {}
+        # _lock 只保护上面两个字典, 不跨网络请求持有; 同一 token 的请求由各自的锁串行化
+        self._lock = Lock()
+        self._fetch_locks: Dict[str, Lock] = {}
+        # invalidate() 时递增, 丢弃失效之前发出的请求结果
+        self._generation = 0
+
+    def get_all(self, client: SXWLClient, fresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """返回 service_name -> 服务信息 的映射, fresh 为 True 时跳过时间窗口 (仍用 ETag 校验)"""
+        key = client.config.token
+        with self._lock:
+            services = None if fresh else self._cache.get(key)
+            fetch_lock = self._fetch_locks.setdefault(key, Lock())
+        if services is not None:
+            return services
+
+        with fetch_lock:
+            with self._lock:
+                # 等锁期间其他线程可能已经取回了结果
+                services = None if fresh else self._cache.get(key)
+                etag, last = self._validators.get(key, (None, None))
+                generation = self._generation
+            if services is not None:
+                return services
+
+            response = client._make_request('GET', '/job/inference',
+                                            headers={'If-None-Match': etag})
+            if response.status_code == 304 and last is not None:
+                services = last
+            else:
+                status_json = _json(response)
+                # `or ()` 省去每次轮询分配默认空列表, 也兼容 data 为 null
+                services = _index_by(status_json.get('data') or (), 'service_name')
+                etag = response.headers.get('ETag')
+
+            with self._lock:
+                if generation == self._generation:
+                    if etag:
+                        self._validators[key] = (etag, services)
+                    else:
+                        self._validators.pop(key, None)
+                    self._cache[key] = services
+            return services
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+            self._validators.clear()
+
+
+_STATUS_BATCHER = _StatusBatcher()
+
 
 class InferenceService:
+    _batcher = _STATUS_BATCHER
+
     def __init__(self, client: SXWLClient):
         self.client = client
         self.service_name: Optional[str] = None
@@ -84,15 +347,24 @@ class InferenceService:
 
     def deploy(self, model_config: Dict[str, Any]) -> 'InferenceService':
         response = self.client._make_request('POST', '/job/inference', json=model_config)
-        self.service_name = response.json()['service_name']
-        print(f"服务名称: {self.service_name}", flush=True)
-        # 添加到需要清理的资源列表
-        resources_to_cleanup['inference_services'].add(self.service_name)
+        self.service_name = _json(response)['service_name']
+        SXWLClient.clear_cache()
+        logger.info("服务名称: %s", self.service_name)
+        return self
+
+    def __enter__(self) -> 'InferenceService':
+        if self.service_name is not None:
+            with self.client._live_lock:
+                self.client._live_inferences.add(self)
         return self
-    
-    def wait_until_complete(self) -> Dict[str, Any]:
-        """等待服务部署完成并返回结果"""
-        self._wait_for_ready()
+
+    def __exit__(self, *exc_info) -> None:
+        if self.service_name is not None:
+            self.client.delete_inference_service(self.service_name)
+
+    def wait_until_complete(self, timeout: float = DEFAULT_WAIT_TIMEOUT) -> Dict[str, Any]:
+        """等待服务部署完成并返回结果, 超过 timeout 秒仍未就绪时抛出 TimeoutError"""
+        self._wait_for_ready(timeout)
         return {
             "service_name": self.service_name,
             "api_endpoint": self.api_endpoint,
@@ -100,41 +372,88 @@ class InferenceService:
         }
 
     def status(self) -> str:
-        response = self.client._make_request('GET', '/job/inference')
-        status_json = response.json()
-        for item in status_json.get('data', []):
-            if item['service_name'] == self.service_name:
-                return item['status']
-        return 'unknown'
+        item = self._batcher.get_all(self.client).get(self.service_name)
+        return 'unknown' if item is None else item['status']
 
     def output(self) -> Dict[str, Any]:
-        response = self.client._make_request('GET', '/job/inference')
-        result = {}
-        status_json = response.json()
-        for item in status_json.get('data', []):
-            if item['service_name'] == self.service_name:
-                if item['status'] == 'running':
-                    result['chat_url'] = item['api']
-                    return result
-                return {'status': item['status']}
-        return {'status': 'unknown'}
-
-    def _wait_for_ready(self, max_retries: int = 60, retry_interval: int = 30) -> None:
-        for attempt in range(max_retries):
-            response = self.client._make_request('GET', '/job/inference')
-            status_json = response.json()
-            
-            for item in status_json.get('data', []):
-                if item['service_name'] == self.service_name:
-                    if item['status'] == 'running':
-                        self.api_endpoint = item['api']
-                        print(f"服务已就绪: {item}", flush=True)
+        item = self._batcher.get_all(self.client).get(self.service_name)
+        if item is None:
+            return {'status': 'unknown'}
+        status = item['status']
+        return {'chat_url': item['api']} if status == 'running' else {'status': status}
+
+    def _wait_for_ready(self, timeout: float = DEFAULT_WAIT_TIMEOUT, base: float = BACKOFF_BASE,
+                        cap: float = BACKOFF_CAP) -> None:
+        deadline = time.monotonic() + timeout
+        try:
+            self._wait_for_ready_events(deadline, base, cap)
+        except EventStreamUnsupported:
+            logger.info("服务端不支持事件推送, 改为轮询")
+            self._poll_for_ready(deadline, base, cap)
+
+    def _wait_for_ready_events(self, deadline: float, base: float, cap: float) -> None:
+        """通过 /job/inference/events 事件流等待服务进入 running 状态"""
+        last_event_id = None
+        attempt = 0
+        while time.monotonic() < deadline:
+            # 读取超时不超过剩余时间, 避免在截止时间之后仍阻塞在事件流上
+            read_timeout = max(1.0, min(SSE_READ_TIMEOUT, deadline - time.monotonic()))
+            try:
+                with self.client._open_event_stream('/job/inference/events', last_event_id,
+                                                    timeout=(3.05, read_timeout)) as response:
+                    # 连接建立前已进入 running 的服务不会再推送事件, 每次 (重) 连后先查一次当前状态
+                    services = self._batcher.get_all(self.client, fresh=True)
+                    if self._mark_ready(services.get(self.service_name)):
                         return
-                    break
-            
-            print(f"服务启动中... ({attempt + 1}/{max_retries})", flush=True)
-            time.sleep(retry_interval)
-        
+                    for event in _parse_sse(response.iter_lines(chunk_size=None,
+                                                                decode_unicode=True)):
+                        # 收到事件才算连接可用; 建立后立即关闭的空连接仍按失败退避
+                        attempt = 0
+                        last_event_id = event['id'] or last_event_id
+                        item = event['data']
+                        if isinstance(item, dict) and item.get('service_name') == self.service_name:
+                            logger.debug("服务状态: %s", item.get('status'))
+                            if self._mark_ready(item):
+                                return
+                        if time.monotonic() >= deadline:
+                            break
+            except (requests.ConnectionError, requests.Timeout):
+                # 读超时或连接断开, 携带 Last-Event-ID 重连以续传事件
+                pass
+            time.sleep(_backoff_delay(attempt, deadline, base, cap))
+            attempt += 1
+
+        raise TimeoutError("服务启动超时")
+
+    def _mark_ready(self, item: Optional[Dict[str, Any]]) -> bool:
+        """服务处于 running 状态时记录 api_endpoint 并返回 True"""
+        if item is None or item.get('status') != 'running':
+            return False
+        if 'api' not in item:
+            # 推送的事件不一定携带完整的服务信息, 从最新的列表中补全 api
+            item = self._batcher.get_all(self.client, fresh=True).get(self.service_name)
+            if item is None or item.get('status') != 'running' or 'api' not in item:
+                return False
+        self.api_endpoint = item['api']
+        logger.info("服务已就绪: %s", item)
+        return True
+
+    def _poll_for_ready(self, deadline: float, base: float, cap: float) -> None:
+        attempt = 0
+        while time.monotonic() < deadline:
+            try:
+                item = self._batcher.get_all(self.client).get(self.service_name)
+            except requests.Timeout:
+                # 查询超时不代表部署失败, 视为仍在启动中
+                item = None
+            if self._mark_ready(item):
+                return
+
+            delay = _backoff_delay(attempt, deadline, base, cap)
+            logger.debug("服务启动中... (第 %d 次检查, %.1f 秒后重试)", attempt + 1, delay)
+            time.sleep(delay)
+            attempt += 1
+
         raise TimeoutError("服务启动超时")
 
     def chat(self, messages: list) -> Dict[str, Any]:
@@ -145,27 +464,67 @@ class InferenceService:
         headers = {'accept': 'application/json', 'Content-Type': 'application/json'}
         data = {"model": "/mnt/models", "messages": messages}
         
-        response = requests.post(chat_url, headers=headers, json=data)
+        response = requests.post(chat_url, headers=headers, data=_dumps(data),
+                                 timeout=CHAT_TIMEOUT)
         response.raise_for_status()
-        return response.json()
+        return _json(response)
+
+    def chat_stream(self, messages: list) -> Iterator[str]:
+        """以流式方式对话, 模型每生成一段内容就立即返回, 无需等待完整回复"""
+        # 在调用时检查, 而不是等到第一次迭代
+        if not self.api_endpoint:
+            raise RuntimeError("服务尚未就绪")
+        return self._chat_stream(messages)
+
+    def _chat_stream(self, messages: list) -> Iterator[str]:
+        headers = {'Accept': 'text/event-stream', 'Content-Type': 'application/json'}
+        data = {"model": "/mnt/models", "messages": messages, "stream": True}
+        # 复用 client 的对话 session, 多次对话之间保持连接
+        with self.client.chat_session.post(self.api_endpoint, headers=headers,
+                                           data=_dumps(data), stream=True,
+                                           timeout=CHAT_TIMEOUT) as response:
+            response.raise_for_status()
+            response.encoding = 'utf-8'
+            for event in _parse_sse(response.iter_lines(chunk_size=None, decode_unicode=True)):
+                chunk = event['data']
+                if chunk == '[DONE]':
+                    break
+                if not isinstance(chunk, dict):
+                    continue
+                for choice in chunk.get('choices') or ():
+                    content = (choice.get('delta') or {}).get('content')
+                    if content:
+                        yield content
 
 class FinetuneJob:
     def __init__(self, client: SXWLClient):
         self.client = client
         self.job_id: Optional[str] = None
         self.adapter_id: Optional[str] = None
+        # 上一次训练任务列表的 ETag 及其索引, 服务端返回 304 时复用
+        self._etag: Optional[str] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
 
     def start(self, finetune_config: Dict[str, Any]) -> 'FinetuneJob':
         response = self.client._make_request('POST', '/job/finetune', json=finetune_config)
-        self.job_id = response.json()['job_id']
-        print(f"微调任务ID: {self.job_id}", flush=True)
-        # 添加到需要清理的资源列表
-        resources_to_cleanup['finetune_jobs'].add(self.job_id)
+        self.job_id = _json(response)['job_id']
+        SXWLClient.clear_cache()
+        logger.info("微调任务ID: %s", self.job_id)
+        return self
+
+    def __enter__(self) -> 'FinetuneJob':
+        if self.job_id is not None:
+            with self.client._live_lock:
+                self.client._live_finetunes.add(self)
         return self
 
-    def wait_until_complete(self) -> Dict[str, Any]:
-        """等待任务完成并返回结果"""
-        self._wait_for_completion()
+    def __exit__(self, *exc_info) -> None:
+        if self.job_id is not None:
+            self.client.delete_finetune_job(self.job_id)
+
+    def wait_until_complete(self, timeout: float = DEFAULT_WAIT_TIMEOUT) -> Dict[str, Any]:
+        """等待任务完成并返回结果, 超过 timeout 秒仍未完成时抛出 TimeoutError"""
+        self._wait_for_completion(timeout)
         self._get_adapter_id()
         return {
             "job_id": self.job_id,
@@ -173,41 +532,197 @@ class FinetuneJob:
             "status": "succeeded"
         }
 
-    def _wait_for_completion(self, max_retries: int = 60, retry_interval: int = 30) -> None:
-        for _ in range(max_retries):
-            print(f"正在检查微调任务状态... (第 {_ + 1}/{max_retries} 次尝试)", flush=True)
-            response = self.client._make_request('GET', '/job/training', 
-                                               params={'current': 1, 'size': 1000})
-            
-            print(f"API响应: {response.json()}", flush=True)
-            for job in response.json().get('content', []):
-                if job['jobName'] == self.job_id:
-                    status = job['status']
-                    print(f"微调状态: {status}", flush=True)
-                    
-                    if status == 'succeeded':
-                        return
-                    elif status in ['failed', 'error']:
-                        raise RuntimeError("微调任务失败")
-                    break
-            
-            time.sleep(retry_interval)
+    def _wait_for_completion(self, timeout: float = DEFAULT_WAIT_TIMEOUT, base: float = BACKOFF_BASE,
+                             cap: float = BACKOFF_CAP) -> None:
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while time.monotonic() < deadline:
+            logger.debug("正在检查微调任务状态... (第 %d 次尝试)", attempt + 1)
+            try:
+                response = self.client._make_request('GET', '/job/training',
+                                                   params={'current': 1, 'size': 1000},
+                                                   headers={'If-None-Match': self._etag})
+            except requests.Timeout:
+                # 查询超时不代表任务失败, 沿用上一次的状态继续等待
+                logger.debug("查询微调任务状态超时")
+            else:
+                if response.status_code != 304:
+                    self._etag = response.headers.get('ETag')
+                    body = _json(response)
+                    logger.debug("API响应: %s", body)
+                    self._jobs = _index_by(body.get('content') or (), 'jobName')
+
+            job = self._jobs.get(self.job_id)
+            if job is not None:
+                status = job['status']
+                logger.debug("微调状态: %s", status)
+
+                if status == 'succeeded':
+                    return
+                elif status in ['failed', 'error']:
+                    raise RuntimeError("微调任务失败")
+
+            time.sleep(_backoff_delay(attempt, deadline, base, cap))
+            attempt += 1
         raise TimeoutError("微调任务超时")
 
     def _get_adapter_id(self) -> None:
-        response = self.client._make_request('GET', '/resource/adapters')
-        
-        for adapter in response.json().get('user_list', []):
+        # 缓存的列表可能早于适配器生成, 未命中时强制刷新一次
+        for refresh in (False, True):
+            adapter_id = _find_adapter_id(self.client.get_adapters(refresh=refresh), self.job_id)
+            if adapter_id is not None:
+                self.adapter_id = adapter_id
+                logger.info("适配器ID: %s", self.adapter_id)
+                return
+
+        raise ValueError(f"未找到对应的适配器")
+
+# ---------------------------------------------------------------------------- #
+#                                    Asyncio                                   #
+# ---------------------------------------------------------------------------- #
+class AsyncSXWLClient:
+    """SXWLClient 的 asyncio 版本, 多个等待任务在同一事件循环中共享连接池"""
+
+    def __init__(self, config: APIConfig, session: Optional[ClientSession] = None):
+        self.config = config
+        self.session = session
+
+    async def __aenter__(self) -> 'AsyncSXWLClient':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _make_request(self, method: str, endpoint: str, *,
+                            timeout: ClientTimeout = ASYNC_DEFAULT_TIMEOUT, **kwargs) -> Any:
+        if self.session is None:
+            # ClientSession 需要在事件循环内创建
+            self.session = ClientSession(headers=self.config.headers,
+                                         connector=TCPConnector(limit_per_host=20))
+        url = f"{self.config.base_url}/api{endpoint}"
+        if 'json' in kwargs:
+            kwargs['data'] = _dumps(kwargs.pop('json'))
+        async with self.session.request(method, url, timeout=timeout, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None, loads=orjson.loads)
+
+
+class AsyncInferenceService:
+    def __init__(self, client: AsyncSXWLClient):
+        self.client = client
+        self.service_name: Optional[str] = None
+        self.api_endpoint: Optional[str] = None
+
+    async def deploy(self, model_config: Dict[str, Any]) -> 'AsyncInferenceService':
+        result = await self.client._make_request('POST', '/job/inference', json=model_config)
+        self.service_name = result['service_name']
+        SXWLClient.clear_cache()
+        logger.info("服务名称: %s", self.service_name)
+        return self
+
+    async def wait_until_complete(self, timeout: float = DEFAULT_WAIT_TIMEOUT) -> Dict[str, Any]:
+        """等待服务部署完成并返回结果, 超过 timeout 秒仍未就绪时抛出 TimeoutError"""
+        await self._wait_for_ready(timeout)
+        return {
+            "service_name": self.service_name,
+            "api_endpoint": self.api_endpoint,
+            "status": "running"
+        }
+
+    async def status(self) -> str:
+        status_json = await self.client._make_request('GET', '/job/inference')
+        item = _index_by(status_json.get('data') or (), 'service_name').get(self.service_name)
+        return 'unknown' if item is None else item['status']
+
+    async def _wait_for_ready(self, timeout: float = DEFAULT_WAIT_TIMEOUT, base: float = BACKOFF_BASE,
+                              cap: float = BACKOFF_CAP) -> None:
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while time.monotonic() < deadline:
             try:
-                meta = json.loads(adapter.get('meta', '{}'))
-                if meta.get('finetune_id') == self.job_id:
-                    self.adapter_id = adapter['id']
-                    print(f"适配器ID: {self.adapter_id}", flush=True)
+                status_json = await self.client._make_request('GET', '/job/inference')
+            except asyncio.TimeoutError:
+                # 查询超时不代表部署失败, 视为仍在启动中
+                status_json = {}
+            item = _index_by(status_json.get('data') or (), 'service_name').get(self.service_name)
+            if item is not None and item['status'] == 'running':
+                self.api_endpoint = item['api']
+                logger.info("服务已就绪: %s", item)
+                return
+
+            delay = _backoff_delay(attempt, deadline, base, cap)
+            logger.debug("服务启动中... (第 %d 次检查, %.1f 秒后重试)", attempt + 1, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        raise TimeoutError("服务启动超时")
+
+
+class AsyncFinetuneJob:
+    def __init__(self, client: AsyncSXWLClient):
+        self.client = client
+        self.job_id: Optional[str] = None
+        self.adapter_id: Optional[str] = None
+
+    async def start(self, finetune_config: Dict[str, Any]) -> 'AsyncFinetuneJob':
+        result = await self.client._make_request('POST', '/job/finetune', json=finetune_config)
+        self.job_id = result['job_id']
+        SXWLClient.clear_cache()
+        logger.info("微调任务ID: %s", self.job_id)
+        return self
+
+    async def wait_until_complete(self, timeout: float = DEFAULT_WAIT_TIMEOUT) -> Dict[str, Any]:
+        """等待任务完成并返回结果, 超过 timeout 秒仍未完成时抛出 TimeoutError"""
+        await self._wait_for_completion(timeout)
+        await self._get_adapter_id()
+        return {
+            "job_id": self.job_id,
+            "adapter_id": self.adapter_id,
+            "status": "succeeded"
+        }
+
+    async def _wait_for_completion(self, timeout: float = DEFAULT_WAIT_TIMEOUT,
+                                   base: float = BACKOFF_BASE, cap: float = BACKOFF_CAP) -> None:
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while time.monotonic() < deadline:
+            logger.debug("正在检查微调任务状态... (第 %d 次尝试)", attempt + 1)
+            try:
+                body = await self.client._make_request('GET', '/job/training',
+                                                       params={'current': 1, 'size': 1000})
+            except asyncio.TimeoutError:
+                logger.debug("查询微调任务状态超时")
+                body = {}
+
+            job = _index_by(body.get('content') or (), 'jobName').get(self.job_id)
+            if job is not None:
+                status = job['status']
+                logger.debug("微调状态: %s", status)
+
+                if status == 'succeeded':
                     return
-            except json.JSONDecodeError:
-                continue
-        
-        raise ValueError(f"未找到对应的适配器")
+                elif status in ['failed', 'error']:
+                    raise RuntimeError("微调任务失败")
+
+            await asyncio.sleep(_backoff_delay(attempt, deadline, base, cap))
+            attempt += 1
+        raise TimeoutError("微调任务超时")
+
+    async def _get_adapter_id(self) -> None:
+        body = await self.client._make_request('GET', '/resource/adapters')
+
+        adapter_id = _find_adapter_id(body.get('user_list', []), self.job_id)
+        if adapter_id is not None:
+            self.adapter_id = adapter_id
+            logger.info("适配器ID: %s", self.adapter_id)
+            return
+
+        raise ValueError("未找到对应的适配器")
 
 # ---------------------------------------------------------------------------- #
 #                                   Endpoint                                   #
@@ -261,15 +776,32 @@ class Endpoint:
         Returns:
             The output of the completed job.
         """
-
-        config = APIConfig.create_default()
-        client = SXWLClient(config)
-        
-        inference = InferenceService(client)
+        inference = InferenceService(self.rp_client)
         # 启动任务
         inference = inference.deploy(request_input.get("input"))
-        # 等待任务完成
-        return inference.wait_until_complete()
+        # 等待任务完成, 超时后抛出 TimeoutError
+        return inference.wait_until_complete(timeout)
+
+    async def run_async(
+        self, request_input: Dict[str, Any], client: Optional[AsyncSXWLClient] = None
+    ) -> Dict[str, Any]:
+        """
+        Run the endpoint with the given input and await the deployment without blocking a thread.
+
+        Args:
+            request_input: The input to pass into the endpoint.
+            client: A shared AsyncSXWLClient; pass one to multiplex many runs over the same
+                connection pool. A temporary client is used when omitted.
+
+        Returns:
+            The output of the completed job.
+        """
+        if client is None:
+            async with AsyncSXWLClient(self.rp_client.config) as own_client:
+                return await self.run_async(request_input, own_client)
+
+        inference = await AsyncInferenceService(client).deploy(request_input.get("input"))
+        return await inference.wait_until_complete()
 
     def health(self, timeout: int = 3) -> Dict[str, Any]:
         """
@@ -278,11 +810,9 @@ class Endpoint:
         Args:
             timeout: The number of seconds to wait for the server to respond before giving up.
         """
-        config = APIConfig.create_default()
-        client = SXWLClient(config)
         try:
-            response = client._make_request('GET', '/job/health', timeout=timeout)
-            return response.json()
+            response = self.rp_client._make_request('GET', '/job/health', timeout=timeout)
+            return _json(response)
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
@@ -293,10 +823,8 @@ class Endpoint:
         Args:
             timeout: The number of seconds to wait for the server to respond before giving up.
         """
-        config = APIConfig.create_default()
-        client = SXWLClient(config)
         try:
-            response = client._make_request('POST', '/job/purge-queue', timeout=timeout)
-            return response.json()
+            response = self.rp_client._make_request('POST', '/job/purge-queue', timeout=timeout)
+            return _json(response)
         except Exception as e:
             return {"status": "error", "message": str(e)}
\ No newline at end of file
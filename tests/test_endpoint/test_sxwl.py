@@ -0,0 +1,970 @@
+"""
+Tests for runpod | endpoint | sxwl.py
+"""
+
+import asyncio
+import gc
+import threading
+import time
+import unittest
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import orjson
+import requests
+
+from runpod.endpoint import sxwl
+from runpod.endpoint.sxwl import (
+    APIConfig,
+    AsyncFinetuneJob,
+    AsyncInferenceService,
+    AsyncSXWLClient,
+    Endpoint,
+    EventStreamUnsupported,
+    FinetuneJob,
+    InferenceService,
+    SXWLClient,
+)
+
+
+def _sse_response(lines, status_code=200, content_type="text/event-stream"):
+    """Build a mock streaming response usable as a context manager."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.headers = {"Content-Type": content_type}
+    response.iter_lines.return_value = iter(lines)
+    response.__enter__.return_value = response
+    return response
+
+
+def _json_response(payload=None, status_code=200, etag=None):
+    """Build a mock JSON response, optionally carrying an ETag."""
+    response = Mock()
+    response.status_code = status_code
+    response.content = b"" if payload is None else orjson.dumps(payload)
+    response.headers = {"ETag": etag} if etag else {}
+    return response
+
+
+class _FakeClock:
+    """Stands in for the time module so deadline loops run instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class _LocalServer:
+    """A local HTTP server that replays queued (delay, status, body) replies."""
+
+    def __init__(self):
+        self.replies = []
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            """Answers every method with the next queued reply."""
+
+            def _reply(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                server.requests.append((self.command, self.path, dict(self.headers), self.rfile.read(length)))
+                delay, status, body = server.replies.pop(0)
+                time.sleep(delay)
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass  # the client already gave up
+
+            do_GET = do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class TestBackoffDelay(unittest.TestCase):
+    """Tests for the jittered exponential backoff"""
+
+    def test_grows_and_caps(self):
+        """Delays start near the base, grow geometrically and stop at the cap."""
+        far = float("inf")
+        self.assertTrue(1.4 <= sxwl._backoff_delay(0, far) <= 2)  # pylint: disable=protected-access
+        self.assertTrue(3.1 <= sxwl._backoff_delay(2, far) <= 4.5)  # pylint: disable=protected-access
+        self.assertTrue(21 <= sxwl._backoff_delay(20, far) <= 30)  # pylint: disable=protected-access
+
+    def test_large_attempt_does_not_overflow(self):
+        """Very long waits keep backing off at the cap instead of overflowing."""
+        self.assertTrue(21 <= sxwl._backoff_delay(10000, float("inf")) <= 30)  # pylint: disable=protected-access
+
+    @patch("runpod.endpoint.sxwl.time")
+    def test_bounded_by_deadline(self, mock_time):
+        """The delay never overshoots the remaining time."""
+        mock_time.monotonic.return_value = 100.0
+        self.assertEqual(sxwl._backoff_delay(10, deadline=101.0, base=2, cap=30), 1.0)  # pylint: disable=protected-access
+        self.assertEqual(sxwl._backoff_delay(10, deadline=50.0), 0.0)  # pylint: disable=protected-access
+
+
+class TestParseSSE(unittest.TestCase):
+    """Tests for the SSE line parser"""
+
+    def test_parses_fields_and_json_data(self):
+        """Events are dispatched on blank lines with event, data and id fields."""
+        lines = [
+            ": keep-alive",
+            "event: status",
+            "id: 7",
+            'data: {"service_name": "svc", "status": "running"}',
+            "",
+            "data: line1",
+            "data:line2",
+            "",
+        ]
+        events = list(sxwl._parse_sse(lines))  # pylint: disable=protected-access
+
+        self.assertEqual(
+            events[0],
+            {"event": "status", "data": {"service_name": "svc", "status": "running"}, "id": "7"},
+        )
+        # id persists across events, event type resets to the default
+        self.assertEqual(events[1], {"event": "message", "data": "line1\nline2", "id": "7"})
+
+    def test_blank_lines_without_data_are_ignored(self):
+        """A blank line with an empty data buffer does not dispatch."""
+        self.assertEqual(list(sxwl._parse_sse(["", "id: 1", ""])), [])  # pylint: disable=protected-access
+
+
+class TestDumps(unittest.TestCase):
+    """Tests for the request body encoder"""
+
+    def test_accepts_what_json_accepts(self):
+        """Non-string keys and integers wider than 64 bits encode as with the json module."""
+        self.assertEqual(orjson.loads(sxwl._dumps({1: "a", "b": [1]})), {"1": "a", "b": [1]})  # pylint: disable=protected-access
+        self.assertEqual(orjson.loads(sxwl._dumps({"n": 2 ** 70})), {"n": 2 ** 70})  # pylint: disable=protected-access
+
+    def test_rejects_unserializable(self):
+        """Objects neither encoder understands still raise TypeError."""
+        with self.assertRaises(TypeError):
+            sxwl._dumps({"x": object()})  # pylint: disable=protected-access
+
+
+class TestAPIConfig(unittest.TestCase):
+    """Tests for APIConfig"""
+
+    @patch("runpod.api_key", b"BYTES_KEY")
+    def test_create_default_decodes_bytes_key(self):
+        """A bytes api_key is decoded once into the bearer header."""
+        config = APIConfig.create_default()
+
+        self.assertEqual(config.token, "BYTES_KEY")
+        self.assertEqual(config.headers["Authorization"], "Bearer BYTES_KEY")
+
+    def test_frozen(self):
+        """The config cannot be rebound after the session is built from it."""
+        config = APIConfig("http://sxwl", "TOKEN", {})
+        with self.assertRaises(AttributeError):
+            config.token = "OTHER"
+
+
+class TestFindAdapterId(unittest.TestCase):
+    """Tests for the adapter meta lookup"""
+
+    @patch("runpod.endpoint.sxwl.orjson.loads", wraps=orjson.loads)
+    def test_only_candidate_meta_is_parsed(self, mock_loads):
+        """Entries whose meta cannot contain the job id are skipped unparsed."""
+        adapters = [
+            {"id": "a1", "meta": '{"finetune_id": "other"}'},
+            {"id": "a2", "meta": None},
+            {"id": "a3"},
+            {"id": "a4", "meta": '{"finetune_id": "job-2", "x": "job"'},
+            {"id": "a5", "meta": '{"finetune_id": "job-1", "base": "job"}'},
+            {"id": "a6", "meta": '{"finetune_id": "job"}'},
+        ]
+
+        self.assertEqual(sxwl._find_adapter_id(adapters, "job"), "a6")  # pylint: disable=protected-access
+        self.assertEqual(mock_loads.call_count, 3)
+
+    def test_not_found(self):
+        """None is returned when no meta matches exactly."""
+        adapters = [{"id": "a1", "meta": '["job"]'}, {"id": "a2", "meta": '{"finetune_id": "job-1"}'}]
+        self.assertIsNone(sxwl._find_adapter_id(adapters, "job"))  # pylint: disable=protected-access
+
+
+class TestSXWLClient(unittest.TestCase):
+    """Tests for SXWLClient"""
+
+    def setUp(self):
+        SXWLClient.clear_cache()
+        self.client = SXWLClient(APIConfig("http://sxwl", "TOKEN", {"Authorization": "Bearer TOKEN"}))
+
+    def test_session_setup(self):
+        """The client keeps one session carrying the auth headers and a pooled adapter."""
+        self.assertEqual(self.client.session.headers["Authorization"], "Bearer TOKEN")
+        adapter = self.client.session.get_adapter("https://sxwl")
+        self.assertIs(adapter, self.client.session.get_adapter("http://sxwl"))
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    @patch.object(requests.Session, "request")
+    def test_make_request_reuses_session(self, mock_request):
+        """Requests go through the shared session without per-call headers."""
+        self.client._make_request("GET", "/job/inference")  # pylint: disable=protected-access
+        self.client._make_request("GET", "/job/inference")  # pylint: disable=protected-access
+
+        self.assertEqual(mock_request.call_count, 2)
+        mock_request.assert_called_with("GET", "http://sxwl/api/job/inference", timeout=(3.05, 15))
+        mock_request.return_value.raise_for_status.assert_called()
+
+    @patch.object(requests.Session, "request")
+    def test_make_request_serializes_json_body(self, mock_request):
+        """JSON bodies are encoded with orjson and sent as raw data."""
+        self.client._make_request("POST", "/job/inference", json={"model": "m"})  # pylint: disable=protected-access
+
+        mock_request.assert_called_once_with(
+            "POST", "http://sxwl/api/job/inference", timeout=(3.05, 15), data=b'{"model":"m"}'
+        )
+
+    @patch.object(requests.Session, "request")
+    def test_make_request_timeout_override(self, mock_request):
+        """Callers can override the default (connect, read) timeout."""
+        self.client._make_request("GET", "/job/health", timeout=3)  # pylint: disable=protected-access
+
+        mock_request.assert_called_once_with("GET", "http://sxwl/api/job/health", timeout=3)
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_get_models_cached(self, mock_request):
+        """The model catalog is fetched once per token until the cache is cleared."""
+        mock_request.return_value.content = orjson.dumps({"public_list": [{"id": 1}], "user_list": [{"id": 2}]})
+
+        self.assertEqual(self.client.get_models(), [{"id": 1}, {"id": 2}])
+        self.assertEqual(self.client.get_models(), [{"id": 1}, {"id": 2}])
+        self.assertEqual(mock_request.call_count, 1)
+
+        SXWLClient.clear_cache()
+        self.client.get_models()
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch.object(SXWLClient, "_make_request", side_effect=requests.HTTPError("boom"))
+    def test_get_models_error_not_cached(self, mock_request):
+        """A failed fetch returns an empty list and is retried on the next call."""
+        self.assertEqual(self.client.get_models(), [])
+        self.assertEqual(self.client.get_models(), [])
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_mutations_invalidate_cache(self, mock_request):
+        """Deleting resources drops the cached listings."""
+        mock_request.return_value.content = orjson.dumps({"public_list": [], "user_list": []})
+        self.client.get_models()
+        self.client.delete_inference_service("svc")
+        self.client.get_models()
+        self.client.delete_finetune_job("job")
+        self.client.get_models()
+
+        self.assertEqual(
+            [c.args[1] for c in mock_request.call_args_list].count("/resource/models"), 3
+        )
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_logs_instead_of_printing(self, mock_request):
+        """Progress goes to the runpod.sxwl logger with lazy arguments."""
+        mock_request.side_effect = requests.HTTPError("boom")
+
+        with self.assertLogs("runpod.sxwl", level="ERROR") as logs, \
+                patch("builtins.print") as mock_print:
+            self.client.delete_inference_service("svc")
+
+        self.assertEqual(logs.output, ["ERROR:runpod.sxwl:删除推理服务失败: boom"])
+        mock_print.assert_not_called()
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_exit_cleanup_only_for_open_with_blocks(self, mock_request):
+        """Only resources still inside a with block are deleted by the exit hook."""
+        mock_request.return_value = _json_response({"service_name": "svc", "job_id": "job"})
+        kept = InferenceService(self.client).deploy({})
+        service = InferenceService(self.client).deploy({}).__enter__()
+        job = FinetuneJob(self.client).start({}).__enter__()
+
+        self.assertEqual(set(self.client._live_inferences), {service})  # pylint: disable=protected-access
+        self.assertEqual(set(self.client._live_finetunes), {job})  # pylint: disable=protected-access
+        # still referenced, yet not tracked: deploy() alone never schedules an exit delete
+        self.assertNotIn(kept, self.client._live_inferences)  # pylint: disable=protected-access
+
+        mock_request.reset_mock()
+        sxwl._cleanup_live_clients()  # pylint: disable=protected-access
+
+        mock_request.assert_any_call("DELETE", "/job/inference", params={"service_name": "svc"})
+        mock_request.assert_any_call("POST", "/userJob/job_del", json={"job_id": "job"})
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertEqual(len(self.client._live_inferences), 0)  # pylint: disable=protected-access
+        self.assertEqual(len(self.client._live_finetunes), 0)  # pylint: disable=protected-access
+
+    def test_client_is_collectable(self):
+        """Neither the exit hook nor the client registry keeps a client alive."""
+        client = SXWLClient(APIConfig("http://sxwl", "TOKEN", {}))
+        ref = weakref.ref(client)
+        self.assertIn(client, sxwl._LIVE_CLIENTS)  # pylint: disable=protected-access
+
+        del client
+        gc.collect()
+
+        self.assertIsNone(ref())
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_failed_delete_stays_tracked(self, mock_request):
+        """A resource whose deletion fails on leaving its with block is kept for the exit hook."""
+        mock_request.return_value = _json_response({"service_name": "svc"})
+        service = InferenceService(self.client).deploy({})
+
+        mock_request.side_effect = requests.HTTPError("boom")
+        with service:
+            pass
+
+        self.assertIn(service, self.client._live_inferences)  # pylint: disable=protected-access
+        # keep the exit hook from reaching the network
+        self.client._live_inferences.discard(service)  # pylint: disable=protected-access
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_context_manager_deletes_on_error(self, mock_request):
+        """Leaving a with block deletes the resource even when it raises."""
+        mock_request.return_value = _json_response({"service_name": "svc", "job_id": "job"})
+
+        with self.assertRaises(KeyError):
+            with InferenceService(self.client).deploy({}):
+                raise KeyError("boom")
+        with FinetuneJob(self.client).start({}):
+            pass
+
+        mock_request.assert_any_call("DELETE", "/job/inference", params={"service_name": "svc"})
+        mock_request.assert_any_call("POST", "/userJob/job_del", json={"job_id": "job"})
+        self.assertEqual(len(self.client._live_inferences), 0)  # pylint: disable=protected-access
+
+    @patch.object(requests.Session, "get")
+    def test_stream_events(self, mock_get):
+        """stream_events sends SSE headers and yields parsed events."""
+        mock_get.return_value = _sse_response(["id: 1", 'data: {"a": 1}', ""])
+
+        events = list(self.client.stream_events("/job/inference/events", last_event_id="0"))
+
+        self.assertEqual(events, [{"event": "message", "data": {"a": 1}, "id": "1"}])
+        headers = mock_get.call_args.kwargs["headers"]
+        self.assertEqual(headers["Accept"], "text/event-stream")
+        self.assertEqual(headers["Last-Event-ID"], "0")
+        self.assertTrue(mock_get.call_args.kwargs["stream"])
+
+    @patch.object(requests.Session, "get")
+    def test_stream_events_unsupported(self, mock_get):
+        """404/415 or a non-SSE content type raise EventStreamUnsupported."""
+        for response in (
+            _sse_response([], status_code=404),
+            _sse_response([], status_code=415),
+            _sse_response([], content_type="application/json"),
+        ):
+            mock_get.return_value = response
+            with self.assertRaises(EventStreamUnsupported):
+                list(self.client.stream_events("/job/inference/events"))
+
+
+class TestInferenceService(unittest.TestCase):
+    """Tests for InferenceService"""
+
+    def setUp(self):
+        SXWLClient.clear_cache()
+        self.client = SXWLClient(APIConfig("http://sxwl", "TOKEN", {}))
+        self.service = InferenceService(self.client)
+        self.service.service_name = "svc"
+        # disable request batching so every poll reaches the mocked transport
+        batcher = patch.object(InferenceService, "_batcher", sxwl._StatusBatcher(ttl=0))  # pylint: disable=protected-access
+        batcher.start()
+        self.addCleanup(batcher.stop)
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_status_and_output(self, mock_request):
+        """status() and output() read the service's entry from the listing."""
+        mock_request.return_value.content = orjson.dumps({"data": [
+            {"service_name": "svc", "status": "running", "api": "http://chat"},
+            {"service_name": "other", "status": "pending"},
+        ]})
+        other = InferenceService(self.client)
+        other.service_name = "other"
+        missing = InferenceService(self.client)
+        missing.service_name = "missing"
+
+        self.assertEqual(self.service.status(), "running")
+        self.assertEqual(self.service.output(), {"chat_url": "http://chat"})
+        self.assertEqual(other.output(), {"status": "pending"})
+        self.assertEqual(missing.status(), "unknown")
+        self.assertEqual(missing.output(), {"status": "unknown"})
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_status_with_null_data(self, mock_request):
+        """A null or missing data field reads as an unknown service."""
+        for payload in ({"data": None}, {}):
+            mock_request.return_value = _json_response(payload)
+            self.assertEqual(self.service.status(), "unknown")
+            self.assertEqual(self.service.output(), {"status": "unknown"})
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_batched_status(self, mock_request):
+        """Instances sharing a batcher issue one request per window."""
+        mock_request.return_value.content = orjson.dumps({"data": [
+            {"service_name": "svc", "status": "running", "api": "u"},
+            {"service_name": "other", "status": "pending"},
+        ]})
+        batcher = sxwl._StatusBatcher(ttl=60)  # pylint: disable=protected-access
+        services = []
+        for name in ("svc", "other", "svc"):
+            service = InferenceService(self.client)
+            service.service_name = name
+            service._batcher = batcher  # pylint: disable=protected-access
+            services.append(service)
+
+        self.assertEqual([s.status() for s in services], ["running", "pending", "running"])
+        self.assertEqual(mock_request.call_count, 1)
+
+        batcher.invalidate()
+        services[0].status()
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_batcher_revalidates_with_etag(self, mock_request):
+        """An expired window is revalidated with If-None-Match and a 304 reuses the index."""
+        mock_request.side_effect = [
+            _json_response({"data": [{"service_name": "svc", "status": "pending"}]}, etag='"v1"'),
+            _json_response(status_code=304),
+            _json_response({"data": [{"service_name": "svc", "status": "running", "api": "u"}]}),
+            _json_response({"data": []}),
+        ]
+
+        self.assertEqual(self.service.status(), "pending")
+        self.assertEqual(self.service.status(), "pending")
+        self.assertEqual(self.service.status(), "running")
+        self.assertEqual(self.service.status(), "unknown")
+
+        sent = [c.kwargs["headers"]["If-None-Match"] for c in mock_request.call_args_list]
+        # no ETag on the third response, so the fourth request is unconditional
+        self.assertEqual(sent, [None, '"v1"', '"v1"', None])
+
+    def test_batcher_slow_fetch_does_not_block_others(self):
+        """A slow listing for one token blocks neither other tokens nor invalidate()."""
+        batcher = sxwl._StatusBatcher(ttl=60)  # pylint: disable=protected-access
+        started, release = threading.Event(), threading.Event()
+
+        def slow_listing(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return _json_response({"data": [{"service_name": "svc", "status": "pending"}]})
+
+        slow = SXWLClient(APIConfig("http://sxwl", "SLOW", {}))
+        slow._make_request = Mock(side_effect=slow_listing)  # pylint: disable=protected-access
+        fast = SXWLClient(APIConfig("http://sxwl", "FAST", {}))
+        fast._make_request = Mock(return_value=_json_response({"data": []}))  # pylint: disable=protected-access
+
+        worker = threading.Thread(target=batcher.get_all, args=(slow,))
+        worker.start()
+        started.wait(5)
+        begin = time.monotonic()
+        self.assertEqual(batcher.get_all(fast), {})
+        batcher.invalidate()
+        elapsed = time.monotonic() - begin
+        release.set()
+        worker.join(5)
+
+        self.assertLess(elapsed, 1)
+        # the listing fetched before invalidate() is not cached
+        batcher.get_all(slow)
+        self.assertEqual(slow._make_request.call_count, 2)  # pylint: disable=protected-access
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_deploy_invalidates_cache(self, mock_request):
+        """Deploying a service clears the cached listings."""
+        mock_request.return_value.content = orjson.dumps({"service_name": "new", "user_list": []})
+        self.client.get_adapters()
+        InferenceService(self.client).deploy({})
+        self.client.get_adapters()
+
+        self.assertEqual(
+            [c.args[1] for c in mock_request.call_args_list].count("/resource/adapters"), 2
+        )
+
+    @patch("runpod.endpoint.sxwl.requests.post")
+    def test_chat(self, mock_post):
+        """chat() returns the decoded completion."""
+        mock_post.return_value = _json_response({"choices": [{"message": {"content": "hi"}}]})
+        self.service.api_endpoint = "http://chat"
+
+        self.assertEqual(self.service.chat([]), {"choices": [{"message": {"content": "hi"}}]})
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], sxwl.CHAT_TIMEOUT)
+
+    @patch.object(requests.Session, "post")
+    def test_chat_stream(self, mock_post):
+        """chat_stream() yields delta content as chunks arrive and stops on [DONE]."""
+        mock_post.return_value = _sse_response([
+            'data: {"choices": [{"delta": {"role": "assistant"}}]}',
+            "",
+            'data: {"choices": [{"delta": {"content": "你"}}]}',
+            "",
+            'data: {"choices": [{"delta": {"content": "好"}}]}',
+            "",
+            "data: [DONE]",
+            "",
+            'data: {"choices": [{"delta": {"content": "ignored"}}]}',
+            "",
+        ])
+        self.service.api_endpoint = "http://chat"
+
+        chunks = list(self.service.chat_stream([{"role": "user", "content": "hi"}]))
+
+        self.assertEqual(chunks, ["你", "好"])
+        body = orjson.loads(mock_post.call_args.kwargs["data"])
+        self.assertTrue(body["stream"])
+        self.assertTrue(mock_post.call_args.kwargs["stream"])
+
+    def test_chat_not_ready(self):
+        """Chatting before the service is ready raises RuntimeError."""
+        with self.assertRaises(RuntimeError):
+            self.service.chat([])
+        with self.assertRaises(RuntimeError):
+            self.service.chat_stream([])
+
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream")
+    def test_wait_for_ready_events(self, mock_open, mock_request):
+        """The waiter returns on the first running event for its own service."""
+        mock_request.return_value = _json_response({"data": [{"service_name": "svc", "status": "pending"}]})
+        mock_open.return_value = _sse_response([
+            'data: {"service_name": "other", "status": "running", "api": "x"}', "",
+            'data: {"service_name": "svc", "status": "pending"}', "",
+            'data: {"service_name": "svc", "status": "running", "api": "http://chat"}', "",
+        ])
+
+        self.service._wait_for_ready()  # pylint: disable=protected-access
+
+        self.assertEqual(self.service.api_endpoint, "http://chat")
+        mock_open.assert_called_once()
+
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream")
+    def test_wait_for_ready_events_snapshot(self, mock_open, mock_request):
+        """A service already running when the stream connects is found without an event."""
+        mock_request.return_value = _json_response(
+            {"data": [{"service_name": "svc", "status": "running", "api": "u"}]}
+        )
+        mock_open.return_value = _sse_response([])
+
+        self.service._wait_for_ready(timeout=5)  # pylint: disable=protected-access
+
+        self.assertEqual(self.service.api_endpoint, "u")
+        mock_open.return_value.iter_lines.assert_not_called()
+
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream")
+    def test_wait_for_ready_events_resumes(self, mock_open, mock_request):
+        """A dropped stream reconnects with the last seen event id and a reset backoff."""
+        mock_request.return_value = _json_response({"data": [{"service_name": "svc", "status": "pending"}]})
+        mock_open.side_effect = [
+            requests.ConnectionError(),
+            requests.ConnectionError(),
+            _sse_response(["id: 5", 'data: {"service_name": "svc", "status": "pending"}', ""]),
+            _sse_response(["id: 6", 'data: {"service_name": "svc", "status": "running", "api": "u"}', ""]),
+        ]
+        clock = _FakeClock()
+
+        with patch("runpod.endpoint.sxwl.time", clock):
+            self.service._wait_for_ready()  # pylint: disable=protected-access
+
+        self.assertEqual(mock_open.call_args_list[3].args[1], "5")
+        self.assertEqual(self.service.api_endpoint, "u")
+        # the sleep after a successful connection starts again from the base delay
+        self.assertGreater(clock.sleeps[1], 2)
+        self.assertLessEqual(clock.sleeps[2], 2)
+
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream")
+    def test_wait_for_ready_events_empty_streams_back_off(self, mock_open, mock_request):
+        """Streams that close without an event keep backing off instead of reconnecting at once."""
+        mock_request.return_value = _json_response({"data": [{"service_name": "svc", "status": "pending"}]})
+        mock_open.side_effect = lambda *args, **kwargs: _sse_response([])
+        clock = _FakeClock()
+
+        with patch("runpod.endpoint.sxwl.time", clock), self.assertRaises(TimeoutError):
+            self.service._wait_for_ready(timeout=1800)  # pylint: disable=protected-access
+
+        # a flat 30s interval would have taken 60 connections
+        self.assertLess(mock_open.call_count, 80)
+        self.assertEqual(mock_request.call_count, mock_open.call_count)
+        # the read timeout outlasts the backoff cap but never the remaining wait
+        self.assertEqual(mock_open.call_args_list[0].kwargs["timeout"], (3.05, sxwl.SSE_READ_TIMEOUT))
+        self.assertLessEqual(mock_open.call_args_list[-1].kwargs["timeout"][1], 30)
+
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream")
+    def test_wait_for_ready_event_without_api(self, mock_open, mock_request):
+        """A running event without the api field is completed from a fresh listing."""
+        mock_request.side_effect = [
+            _json_response({"data": [{"service_name": "svc", "status": "pending"}]}),
+            _json_response({"data": [{"service_name": "svc", "status": "running", "api": "u"}]}),
+        ]
+        mock_open.return_value = _sse_response(['data: {"service_name": "svc", "status": "running"}', ""])
+
+        self.service._wait_for_ready()  # pylint: disable=protected-access
+
+        self.assertEqual(self.service.api_endpoint, "u")
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("runpod.endpoint.sxwl.time.sleep")
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream", side_effect=EventStreamUnsupported("no sse"))
+    def test_wait_for_ready_falls_back_to_polling(self, _mock_stream, mock_request, _mock_sleep):
+        """Without SSE support the waiter polls /job/inference."""
+        pending = Mock()
+        pending.content = orjson.dumps({"data": [{"service_name": "svc", "status": "pending"}]})
+        running = Mock()
+        running.content = orjson.dumps({"data": [{"service_name": "svc", "status": "running", "api": "u"}]})
+        mock_request.side_effect = [pending, running]
+
+        self.service._wait_for_ready()  # pylint: disable=protected-access
+
+        self.assertEqual(self.service.api_endpoint, "u")
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch("runpod.endpoint.sxwl.time.sleep")
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream", side_effect=EventStreamUnsupported("no sse"))
+    def test_wait_for_ready_poll_read_timeout(self, _mock_stream, mock_request, _mock_sleep):
+        """A read timeout while polling is treated as still starting."""
+        mock_request.side_effect = [
+            requests.exceptions.ReadTimeout(),
+            _json_response({"data": [{"service_name": "svc", "status": "running", "api": "u"}]}),
+        ]
+
+        self.service._wait_for_ready()  # pylint: disable=protected-access
+
+        self.assertEqual(self.service.api_endpoint, "u")
+
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream", side_effect=EventStreamUnsupported("no sse"))
+    def test_wait_for_ready_timeout(self, _mock_stream, mock_request):
+        """Polling backs off and raises TimeoutError once the deadline passes."""
+        mock_request.return_value.content = orjson.dumps({"data": []})
+        clock = _FakeClock()
+
+        with patch("runpod.endpoint.sxwl.time", clock), self.assertRaises(TimeoutError):
+            self.service._wait_for_ready(timeout=600)  # pylint: disable=protected-access
+
+        self.assertEqual(clock.now, 600)
+        self.assertLessEqual(max(clock.sleeps), 30)
+        # a flat 30s interval would have taken 20 polls
+        self.assertLess(mock_request.call_count, 40)
+        self.assertLess(clock.sleeps[0], 2.01)
+
+
+class TestFinetuneJob(unittest.TestCase):
+    """Tests for FinetuneJob"""
+
+    def setUp(self):
+        SXWLClient.clear_cache()
+        self.client = SXWLClient(APIConfig("http://sxwl", "TOKEN", {}))
+        self.job = FinetuneJob(self.client)
+        self.job.job_id = "job"
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_get_adapter_id_refreshes_stale_cache(self, mock_request):
+        """A cached list without the adapter is refreshed once before giving up."""
+        stale = Mock()
+        stale.content = orjson.dumps({"user_list": []})
+        fresh = Mock()
+        fresh.content = orjson.dumps({"user_list": [{"id": "a1", "meta": '{"finetune_id": "job"}'}]})
+        mock_request.side_effect = [stale, fresh]
+
+        self.client.get_adapters()
+        self.job._get_adapter_id()  # pylint: disable=protected-access
+
+        self.assertEqual(self.job.adapter_id, "a1")
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_get_adapter_id_missing(self, mock_request):
+        """ValueError is raised when no adapter matches the job."""
+        mock_request.return_value.content = orjson.dumps({"user_list": [{"id": "a1", "meta": "{"}]})
+
+        with self.assertRaises(ValueError):
+            self.job._get_adapter_id()  # pylint: disable=protected-access
+
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_wait_for_completion(self, mock_request):
+        """The finetune waiter backs off until the job succeeds or fails."""
+        running = Mock()
+        running.content = orjson.dumps({"content": [{"jobName": "job", "status": "running"}]})
+        done = Mock()
+        done.content = orjson.dumps({"content": [{"jobName": "job", "status": "succeeded"}]})
+        failed = Mock()
+        failed.content = orjson.dumps({"content": [{"jobName": "job", "status": "failed"}]})
+        clock = _FakeClock()
+
+        with patch("runpod.endpoint.sxwl.time", clock):
+            mock_request.side_effect = [running, running, done]
+            self.job._wait_for_completion()  # pylint: disable=protected-access
+            self.assertEqual(len(clock.sleeps), 2)
+
+            mock_request.side_effect = [failed]
+            with self.assertRaises(RuntimeError):
+                self.job._wait_for_completion()  # pylint: disable=protected-access
+
+            mock_request.side_effect = None
+            mock_request.return_value = running
+            with self.assertRaises(TimeoutError):
+                self.job._wait_for_completion(timeout=60)  # pylint: disable=protected-access
+
+    @patch("runpod.endpoint.sxwl._json", wraps=sxwl._json)  # pylint: disable=protected-access
+    @patch.object(SXWLClient, "_make_request")
+    def test_wait_for_completion_parses_once(self, mock_request, mock_json):
+        """Each training listing is decoded once per poll."""
+        mock_request.return_value = _json_response({"content": [{"jobName": "job", "status": "succeeded"}]})
+
+        with self.assertLogs("runpod.sxwl", level="DEBUG"):
+            self.job._wait_for_completion()  # pylint: disable=protected-access
+
+        self.assertEqual(mock_json.call_count, 1)
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_wait_for_completion_read_timeout(self, mock_request):
+        """A read timeout while polling is treated as still running."""
+        mock_request.side_effect = [
+            requests.exceptions.ReadTimeout(),
+            _json_response({"content": [{"jobName": "job", "status": "succeeded"}]}),
+        ]
+
+        with patch("runpod.endpoint.sxwl.time", _FakeClock()):
+            self.job._wait_for_completion()  # pylint: disable=protected-access
+
+        self.assertEqual(mock_request.call_count, 2)
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_wait_for_completion_not_modified(self, mock_request):
+        """A 304 reuses the previous job listing without parsing a body."""
+        mock_request.side_effect = [
+            _json_response({"content": [{"jobName": "job", "status": "running"}]}, etag='"t1"'),
+            _json_response(status_code=304),
+            _json_response({"content": [{"jobName": "job", "status": "succeeded"}]}, etag='"t2"'),
+        ]
+
+        with patch("runpod.endpoint.sxwl.time", _FakeClock()):
+            self.job._wait_for_completion()  # pylint: disable=protected-access
+
+        sent = [c.kwargs["headers"]["If-None-Match"] for c in mock_request.call_args_list]
+        self.assertEqual(sent, [None, '"t1"', '"t1"'])
+        self.assertEqual(self.job._etag, '"t2"')  # pylint: disable=protected-access
+
+
+class TestLocalServer(unittest.TestCase):
+    """Requests sent through the real transport to a local HTTP server"""
+
+    def setUp(self):
+        self.server = _LocalServer()
+        self.addCleanup(self.server.close)
+        self.client = SXWLClient(APIConfig(self.server.url, "TOKEN", {}))
+
+    def test_chat_stream_sends_no_credentials(self):
+        """Chat requests to the model endpoint carry no control-plane auth headers."""
+        self.client = SXWLClient(APIConfig(self.server.url, "TOKEN", {
+            "Authorization": "Bearer TOKEN", "Origin": self.server.url,
+        }))
+        self.server.replies = [(0, 200, b'data: {"choices": [{"delta": {"content": "hi"}}]}\n\ndata: [DONE]\n\n')]
+        service = InferenceService(self.client)
+        service.api_endpoint = f"{self.server.url}/v1/chat/completions"
+
+        self.assertEqual(list(service.chat_stream([])), ["hi"])
+
+        _, path, headers, body = self.server.requests[0]
+        self.assertEqual(path, "/v1/chat/completions")
+        self.assertNotIn("Authorization", headers)
+        self.assertNotIn("Origin", headers)
+        self.assertEqual(headers["Content-Type"], "application/json")
+        self.assertTrue(orjson.loads(body)["stream"])
+
+    def test_read_timeout_is_not_retried(self):
+        """A slow reply raises ReadTimeout after one attempt instead of a retried ConnectionError."""
+        self.server.replies = [(0.5, 200, b"{}")] * 4
+
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.client._make_request("GET", "/job/training", timeout=(1, 0.1))  # pylint: disable=protected-access
+
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_wait_for_completion_survives_slow_poll(self):
+        """The finetune waiter keeps polling after a status request times out."""
+        # as many slow replies as the adapter has attempts, so a retried read would give up
+        self.server.replies = [(0.5, 200, b"{}")] * 4 + [
+            (0, 200, orjson.dumps({"content": [{"jobName": "job", "status": "succeeded"}]})),
+        ]
+        job = FinetuneJob(self.client)
+        job.job_id = "job"
+        make_request = SXWLClient._make_request  # pylint: disable=protected-access
+
+        def short_timeout(client, *args, **kwargs):
+            return make_request(client, *args, timeout=(1, 0.1), **kwargs)
+
+        with patch.object(SXWLClient, "_make_request", short_timeout), \
+                patch("runpod.endpoint.sxwl.time", _FakeClock()):
+            job._wait_for_completion(timeout=600)  # pylint: disable=protected-access
+
+        self.assertEqual(len(self.server.requests), 5)
+
+
+class TestEndpoint(unittest.TestCase):
+    """Tests for Endpoint"""
+
+    def setUp(self):
+        self.endpoint = Endpoint("INFERENCE")
+
+    @patch.object(InferenceService, "wait_until_complete", return_value={"status": "running"})
+    @patch.object(SXWLClient, "_make_request")
+    def test_run_sync_reuses_client(self, mock_request, mock_wait):
+        """run_sync deploys on the endpoint's own client instead of building a new one."""
+        mock_request.return_value = _json_response({"service_name": "svc"})
+
+        with patch.object(sxwl, "SXWLClient", side_effect=AssertionError("new client")), \
+                patch.object(APIConfig, "create_default", side_effect=AssertionError("new config")):
+            self.assertEqual(self.endpoint.run_sync({"input": {"model_id": "m"}}), {"status": "running"})
+
+        mock_request.assert_called_once_with("POST", "/job/inference", json={"model_id": "m"})
+        mock_wait.assert_called_once_with(86400)
+
+    @patch.object(SXWLClient, "_make_request")
+    @patch.object(SXWLClient, "_open_event_stream", side_effect=EventStreamUnsupported("no sse"))
+    def test_run_sync_timeout(self, _mock_open, mock_request):
+        """run_sync stops waiting after its timeout."""
+        mock_request.side_effect = [_json_response({"service_name": "svc"})] + [
+            _json_response({"data": [{"service_name": "svc", "status": "pending"}]})
+        ] * 20
+        clock = _FakeClock()
+
+        with patch("runpod.endpoint.sxwl.time", clock), self.assertRaises(TimeoutError):
+            self.endpoint.run_sync({"input": {"model_id": "m"}}, timeout=60)
+
+        self.assertEqual(clock.now, 60)
+
+    @patch.object(SXWLClient, "_make_request")
+    def test_health_and_purge_queue(self, mock_request):
+        """health and purge_queue go through the endpoint's client."""
+        mock_request.return_value = _json_response({"workers": 1})
+
+        self.assertEqual(self.endpoint.health(), {"workers": 1})
+        self.assertEqual(self.endpoint.purge_queue(), {"workers": 1})
+        mock_request.assert_any_call("GET", "/job/health", timeout=3)
+        mock_request.assert_any_call("POST", "/job/purge-queue", timeout=3)
+
+        mock_request.side_effect = requests.HTTPError("boom")
+        self.assertEqual(self.endpoint.health(), {"status": "error", "message": "boom"})
+        self.assertEqual(self.endpoint.purge_queue(), {"status": "error", "message": "boom"})
+
+
+class TestAsyncSXWL(IsolatedAsyncioTestCase):
+    """Tests for the asyncio client and waiters"""
+
+    def setUp(self):
+        self.config = APIConfig("http://sxwl", "TOKEN", {})
+
+    async def test_make_request(self):
+        """_make_request returns the decoded JSON body of the response."""
+        response = AsyncMock()
+        response.raise_for_status = Mock()
+        response.json.return_value = {"data": []}
+        session = MagicMock()
+        session.request.return_value.__aenter__.return_value = response
+        session.close = AsyncMock()
+
+        async with AsyncSXWLClient(self.config, session) as client:
+            body = await client._make_request("GET", "/job/inference")  # pylint: disable=protected-access
+
+        self.assertEqual(body, {"data": []})
+        session.request.assert_called_once_with(
+            "GET", "http://sxwl/api/job/inference", timeout=sxwl.ASYNC_DEFAULT_TIMEOUT
+        )
+        session.close.assert_awaited_once()
+
+    @patch("runpod.endpoint.sxwl.asyncio.sleep", new_callable=AsyncMock)
+    async def test_inference_wait_for_ready(self, mock_sleep):
+        """The async waiter sleeps on the event loop between polls."""
+        client = AsyncSXWLClient(self.config)
+        client._make_request = AsyncMock(side_effect=[  # pylint: disable=protected-access
+            {"service_name": "svc"},
+            asyncio.TimeoutError(),
+            {"data": [{"service_name": "svc", "status": "pending"}]},
+            {"data": [{"service_name": "svc", "status": "running", "api": "u"}]},
+        ])
+
+        service = await AsyncInferenceService(client).deploy({})
+        result = await service.wait_until_complete()
+
+        self.assertEqual(result, {"service_name": "svc", "api_endpoint": "u", "status": "running"})
+        self.assertEqual(mock_sleep.await_count, 2)
+
+    async def test_inference_status(self):
+        """The async status lookup indexes the listing by service name."""
+        client = AsyncSXWLClient(self.config)
+        client._make_request = AsyncMock(return_value={"data": [  # pylint: disable=protected-access
+            {"service_name": "other", "status": "running"},
+            {"service_name": "svc", "status": "pending"},
+        ]})
+        service = AsyncInferenceService(client)
+        service.service_name = "svc"
+        missing = AsyncInferenceService(client)
+        missing.service_name = "missing"
+
+        self.assertEqual(await service.status(), "pending")
+        self.assertEqual(await missing.status(), "unknown")
+
+    @patch("runpod.endpoint.sxwl.asyncio.sleep", new_callable=AsyncMock)
+    async def test_finetune_wait_until_complete(self, _mock_sleep):
+        """The async finetune waiter resolves the adapter once the job succeeds."""
+        client = AsyncSXWLClient(self.config)
+        client._make_request = AsyncMock(side_effect=[  # pylint: disable=protected-access
+            {"job_id": "job"},
+            asyncio.TimeoutError(),
+            {"content": [{"jobName": "job", "status": "running"}]},
+            {"content": [{"jobName": "job", "status": "succeeded"}]},
+            {"user_list": [{"id": "a1", "meta": "bad"}, {"id": "a2", "meta": '{"finetune_id": "job"}'}]},
+        ])
+
+        job = await AsyncFinetuneJob(client).start({})
+        result = await job.wait_until_complete()
+
+        self.assertEqual(result, {"job_id": "job", "adapter_id": "a2", "status": "succeeded"})
+
+    @patch.object(AsyncInferenceService, "wait_until_complete", new_callable=AsyncMock)
+    @patch.object(AsyncSXWLClient, "_make_request", new_callable=AsyncMock)
+    async def test_endpoint_run_async(self, mock_request, mock_wait):
+        """Endpoint.run_async deploys and awaits the service on a temporary client."""
+        mock_request.return_value = {"service_name": "svc"}
+        mock_wait.return_value = {"status": "running"}
+
+        result = await Endpoint("INFERENCE").run_async({"input": {"model_id": "m"}})
+
+        self.assertEqual(result, {"status": "running"})
+        mock_request.assert_awaited_once_with("POST", "/job/inference", json={"model_id": "m"})
+
+
+if __name__ == "__main__":
+    unittest.main()